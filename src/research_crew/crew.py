@@ -1,25 +1,39 @@
 from crewai import Agent, Task, Crew, Process
 from langchain_community.llms import OpenAI
 
-from tools.arxiv_tools import SmartResearchFetcher
-from tools.summarizer_tool import EnhancedSummarizerTool
-from tools.supabase_tool import SupabaseTool
+from .tools.arxiv_tools import SmartResearchFetcher
+from .tools.summarizer_tool import EnhancedSummarizerTool
+from .tools.supabase_tool import SupabaseTool
 
+from functools import lru_cache
+from pathlib import Path
 import yaml
 import os
 
+CONFIG_DIR = Path(__file__).resolve().parent / 'config'
+
+# libyaml's C loader when available, pure-Python fallback otherwise
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+@lru_cache(maxsize=2)
+def _load_yaml_config(path: Path) -> dict:
+    """Parse a config file once per process; the files don't change between runs"""
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=_YAML_LOADER)
+
 class ResearchCrew:
-    def __init__(self):
+    def __init__(self, verbose: bool = False):
+        # CrewAI's verbose mode prints every agent step to stdout; keep it
+        # off for scheduled runs and rely on the logging setup instead
+        self.verbose = verbose
         self.load_configs()
         self.setup_tools()
         self.setup_agents()
         self.setup_tasks()
         
     def load_configs(self):
-        with open('src/research_crew/config/agents.yaml', 'r') as f:
-            self.agents_config = yaml.safe_load(f)
-        with open('src/research_crew/config/tasks.yaml', 'r') as f:
-            self.tasks_config = yaml.safe_load(f)
+        self.agents_config = _load_yaml_config(CONFIG_DIR / 'agents.yaml')
+        self.tasks_config = _load_yaml_config(CONFIG_DIR / 'tasks.yaml')
     
     def setup_tools(self):
         self.research_fetcher = SmartResearchFetcher()
@@ -30,19 +44,19 @@ class ResearchCrew:
         self.research_fetcher_agent = Agent(
             config=self.agents_config['rss_fetcher'],
             tools=[self.research_fetcher],
-            verbose=True
+            verbose=self.verbose
         )
         
         self.research_summarizer = Agent(
             config=self.agents_config['research_summarizer'],
             tools=[self.summarizer_tool],
-            verbose=True
+            verbose=self.verbose
         )
         
         self.database_manager = Agent(
             config=self.agents_config['database_manager'],
             tools=[self.supabase_tool],
-            verbose=True
+            verbose=self.verbose
         )
     
     def setup_tasks(self):
@@ -68,7 +82,7 @@ class ResearchCrew:
             agents=[self.research_fetcher_agent, self.research_summarizer, self.database_manager],
             tasks=[self.fetch_task, self.summarize_task, self.store_task],
             process=Process.sequential,
-            verbose=True
+            verbose=self.verbose
         )
         
         return crew.kickoff() 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from crew import ResearchCrew
+from research_crew.crew import ResearchCrew
 from dotenv import load_dotenv
 import schedule
 import time
@@ -17,7 +17,7 @@ def setup_logging():
         ]
     )
 
-def run_research_pipeline():
+def run_research_pipeline(verbose: bool = False):
     """Execute the research crew pipeline with error handling"""
     try:
         logging.info("Starting research pipeline execution...")
@@ -27,7 +27,7 @@ def run_research_pipeline():
         load_dotenv()
         
         # Initialize and run the research crew
-        research_crew = ResearchCrew()
+        research_crew = ResearchCrew(verbose=verbose)
         result = research_crew.run()
         
         logging.info("Research pipeline completed successfully")
@@ -42,7 +42,7 @@ def run_research_pipeline():
         print(f"Pipeline failed: {str(e)}")
         raise
 
-def start_scheduler():
+def start_scheduler(verbose: bool = False):
     """Start the scheduler for daily execution at 2 AM"""
     setup_logging()
     
@@ -50,17 +50,21 @@ def start_scheduler():
     print("Research Pipeline Scheduler started")
     
     # Schedule the task to run daily at 2:00 AM
-    schedule.every().day.at("02:00").do(run_research_pipeline)
+    schedule.every().day.at("02:00").do(run_research_pipeline, verbose=verbose)
     
     logging.info("Scheduled research pipeline to run daily at 2:00 AM")
     print("Scheduled research pipeline to run daily at 2:00 AM")
     print("Press Ctrl+C to stop the scheduler")
     
-    # Keep the scheduler running
+    # Keep the scheduler running, sleeping until the next job is due
     while True:
         try:
+            idle = schedule.idle_seconds()
+            if idle is None:
+                break  # No jobs left to run
+            if idle > 0:
+                time.sleep(min(idle, 3600))  # Wake at least hourly
             schedule.run_pending()
-            time.sleep(60)  # Check every minute
         except KeyboardInterrupt:
             logging.info("Scheduler stopped by user")
             print("\n Scheduler stopped by user")
@@ -77,33 +81,39 @@ def main():
                        help='Start scheduler to run daily at 2 AM')
     parser.add_argument('--test-schedule', action='store_true',
                        help='Test scheduler (runs every 2 minutes)')
+    parser.add_argument('--verbose', action='store_true',
+                       help='Print every CrewAI agent step to stdout')
     
     args = parser.parse_args()
     
     if args.schedule:
         # Start the daily scheduler
-        start_scheduler()
+        start_scheduler(verbose=args.verbose)
     elif args.test_schedule:
         # Test scheduler (runs every 2 minutes for testing)
         setup_logging()
         print("Starting TEST scheduler (every 2 minutes)")
-        schedule.every(2).minutes.do(run_research_pipeline)
+        schedule.every(2).minutes.do(run_research_pipeline, verbose=args.verbose)
         
         # Run once immediately for testing
         print("Running once immediately...")
-        run_research_pipeline()
+        run_research_pipeline(verbose=args.verbose)
         
         while True:
             try:
+                idle = schedule.idle_seconds()
+                if idle is None:
+                    break
+                if idle > 0:
+                    time.sleep(idle)
                 schedule.run_pending()
-                time.sleep(30)
             except KeyboardInterrupt:
                 print("\n Test scheduler stopped")
                 break
     else:
         # Run once (original behavior)
         setup_logging()
-        result = run_research_pipeline()
+        result = run_research_pipeline(verbose=args.verbose)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,47 +1,105 @@
 from crewai.tools import BaseTool
-import requests
 import xml.etree.ElementTree as ET
-import urllib.parse
-from typing import List, Dict, Optional
+import io
+import json
+from typing import ClassVar, List, Dict, Iterable, Iterator, Optional, Tuple
 import feedparser
-from datetime import datetime, timedelta
-from difflib import SequenceMatcher
+from datetime import date, datetime, timedelta, timezone
 from pydantic import Field
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain, islice
 import logging
+import re
+import time
+from types import MappingProxyType
+
+from ..utils.cache import DiskCache
+from ..utils.http import get_session
+from ..utils.serialization import dumps
+
+__all__ = ['OptimizedArXivTool', 'HuggingFaceSupplementTool', 'SmartResearchFetcher']
+
+# ArXiv queries only change once a day (date window + fixed categories)
+_ARXIV_CACHE = DiskCache('arxiv', ttl=6 * 60 * 60)
+
+# How long SmartResearchFetcher reuses a combined result in-process
+_RESULT_TTL = 60 * 60
+
+ARXIV_API_URL = "http://export.arxiv.org/api/query"
+
+_ATOM = '{http://www.w3.org/2005/Atom}'
+_DC = '{http://purl.org/dc/elements/1.1/}'
+
+# ArXiv categories for AI/ML research
+_CATEGORIES = (
+    'cs.AI',    # Artificial Intelligence
+    'cs.LG',    # Machine Learning
+    'cs.CL',    # Computation and Language (NLP)
+    'cs.CV',    # Computer Vision
+    'cs.NE',    # Neural and Evolutionary Computing
+    'stat.ML'   # Machine Learning (Statistics)
+)
+_CAT_QUERY = ' OR '.join(f'cat:{cat}' for cat in _CATEGORIES)
+
+# Classification mapping
+_CLASSIFICATION_MAP = MappingProxyType({
+    'cs.CV': 'Computer Vision',
+    'cs.CL': 'Natural Language Processing',
+    'cs.LG': 'Machine Learning',
+    'cs.AI': 'Artificial Intelligence',
+    'cs.NE': 'Neural Computing',
+    'stat.ML': 'Statistical ML'
+})
+
+# Keyword fallback for classification, in priority order
+_KEYWORD_CATEGORIES = (
+    ('Computer Vision', ('vision', 'image', 'visual', 'cnn', 'object detection')),
+    ('Natural Language Processing', ('nlp', 'language', 'text', 'bert', 'transformer')),
+    ('Reinforcement Learning', ('reinforcement', 'rl', 'agent', 'policy')),
+    ('Deep Learning', ('neural', 'deep', 'network', 'cnn', 'rnn')),
+)
+
+# One alternation with a named group per category (c0, c1, ...), so a
+# single scan of the text finds every category that has a keyword in it.
+# Keywords must start a word but may run on, so plurals and inflections
+# ('images', 'networks', 'agents') match while 'rl' inside 'world' does not
+_KEYWORD_PATTERN = re.compile(
+    '|'.join(
+        rf"(?P<c{i}>\b(?:{'|'.join(map(re.escape, keywords))}))"
+        for i, (_, keywords) in enumerate(_KEYWORD_CATEGORIES)
+    ),
+    re.IGNORECASE,
+)
+
+# Title words for deduplication; punctuation is not part of a word, so
+# "Attention is all you need!" shingles the same as without the "!"
+_TITLE_WORD = re.compile(r'\w+')
 
 class OptimizedArXivTool(BaseTool):
     name: str = "ArXiv Research Fetcher"
     description: str = "Fetches latest AI/ML research papers from ArXiv"
     
-    def _run(self, limit: int = 5, days_back: int = 7) -> List[Dict]:
+    def _run(self, limit: int = 5, days_back: int = 7, force_refresh: bool = False) -> List[Dict]:
         """
         Fetch recent AI/ML papers from ArXiv
         
         Args:
             limit: Number of papers to fetch
             days_back: How many days back to search
+            force_refresh: Bypass the on-disk response cache
         """
-        logging.info(f"Fetching {limit} papers from ArXiv for the last {days_back} days")
-        
-        # ArXiv categories for AI/ML research
-        categories = [
-            'cs.AI',    # Artificial Intelligence
-            'cs.LG',    # Machine Learning  
-            'cs.CL',    # Computation and Language (NLP)
-            'cs.CV',    # Computer Vision
-            'cs.NE',    # Neural and Evolutionary Computing
-            'stat.ML'   # Machine Learning (Statistics)
-        ]
+        if limit <= 0:
+            return []
         
-        # Build search query
-        cat_query = ' OR '.join([f'cat:{cat}' for cat in categories])
+        logging.info(f"Fetching {limit} papers from ArXiv for the last {days_back} days")
         
         # Date filter (last week)
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days_back)
         date_filter = f'submittedDate:[{start_date.strftime("%Y%m%d")}* TO {end_date.strftime("%Y%m%d")}*]'
         
-        search_query = f'({cat_query}) AND {date_filter}'
+        search_query = f'({_CAT_QUERY}) AND {date_filter}'
         logging.info(f"Search query: {search_query}")
         
         # ArXiv API parameters
@@ -53,45 +111,45 @@ class OptimizedArXivTool(BaseTool):
             'sortOrder': 'descending'
         }
         
-        # Build URL
-        base_url = "http://export.arxiv.org/api/query?"
-        query_string = "&".join([f"{k}={urllib.parse.quote(str(v))}" for k, v in params.items()])
-        url = base_url + query_string
+        cache_key = json.dumps(params, sort_keys=True)
+        if not force_refresh:
+            cached_papers = _ARXIV_CACHE.get(cache_key)
+            if cached_papers is not None:
+                logging.info(f"Using {len(cached_papers)} cached ArXiv papers for this query")
+                return cached_papers
         
         try:
-            logging.info(f"Making request to ArXiv API: {url}")
-            response = requests.get(url, timeout=30)
+            logging.info(f"Making request to ArXiv API: {ARXIV_API_URL}")
+            response = get_session().get(ARXIV_API_URL, params=params, timeout=30)
             response.raise_for_status()
             
-            # Parse XML
-            root = ET.fromstring(response.content)
             papers = []
+            fetched_at = datetime.now(timezone.utc).isoformat()
             
-            namespace = {'atom': 'http://www.w3.org/2005/Atom'}
-            
-            for entry in root.findall('atom:entry', namespace)[:limit]:
+            # Single streaming pass over the feed: each entry's children are
+            # visited once and the entry is cleared as soon as it is parsed
+            for _, elem in ET.iterparse(io.BytesIO(response.content), events=('end',)):
+                if elem.tag != f'{_ATOM}entry':
+                    continue
+                if len(papers) >= limit:
+                    break
+                
                 try:
-                    # Extract basic info
-                    title = entry.find('atom:title', namespace).text.strip().replace('\n', ' ')
-                    summary = entry.find('atom:summary', namespace).text.strip().replace('\n', ' ')
+                    entry = self._parse_entry(elem)
                     
-                    # Authors
-                    authors = []
-                    for author in entry.findall('atom:author', namespace):
-                        name = author.find('atom:name', namespace).text
-                        authors.append(name)
+                    # Extract basic info
+                    title = entry['title'].strip().replace('\n', ' ')
+                    summary = entry['summary'].strip().replace('\n', ' ')
+                    authors = entry['authors']
                     
                     # ArXiv ID and links
-                    entry_id = entry.find('atom:id', namespace).text
-                    arxiv_id = entry_id.split('/')[-1]
+                    arxiv_id = entry['id'].split('/')[-1]
                     
                     # Published date
-                    published = entry.find('atom:published', namespace).text
+                    published = entry['published']
                     
                     # Categories
-                    categories_list = []
-                    for category in entry.findall('atom:category', namespace):
-                        categories_list.append(category.get('term'))
+                    categories_list = entry['categories']
                     
                     # Determine primary category for classification
                     primary_category = self._classify_paper(categories_list, title, summary)
@@ -107,7 +165,7 @@ class OptimizedArXivTool(BaseTool):
                         'categories': categories_list,
                         'primary_category': primary_category,
                         'source': 'arxiv',
-                        'fetched_at': datetime.now().isoformat()
+                        'fetched_at': fetched_at
                     }
                     
                     logging.info(f"Successfully parsed paper: {title}")
@@ -116,45 +174,57 @@ class OptimizedArXivTool(BaseTool):
                 except Exception as e:
                     logging.error(f"Error parsing paper: {str(e)}")
                     continue
+                finally:
+                    elem.clear()
             
             logging.info(f"Successfully fetched {len(papers)} papers from ArXiv")
-            return papers[:limit]  # Return exactly the requested number
+            papers = papers[:limit]  # Return exactly the requested number
+            if papers:
+                _ARXIV_CACHE.set(cache_key, papers)
+            return papers
             
         except Exception as e:
             logging.error(f"Error fetching from ArXiv: {str(e)}")
             return []
     
+    @staticmethod
+    def _parse_entry(entry: ET.Element) -> Dict:
+        """Collect the fields of one Atom entry in a single pass over its children"""
+        fields = {'authors': [], 'categories': []}
+        for child in entry:
+            tag = child.tag.rsplit('}', 1)[-1]
+            if tag == 'author':
+                fields['authors'].append(child.findtext(f'{_ATOM}name'))
+            elif tag == 'category':
+                fields['categories'].append(child.get('term'))
+            elif tag in ('title', 'summary', 'id', 'published'):
+                fields[tag] = child.text
+        return fields
+    
     def _classify_paper(self, categories: List[str], title: str, abstract: str) -> str:
         """Classify paper into main research area"""
-        
-        # Classification mapping
-        classification_map = {
-            'cs.CV': 'Computer Vision',
-            'cs.CL': 'Natural Language Processing',
-            'cs.LG': 'Machine Learning',
-            'cs.AI': 'Artificial Intelligence',
-            'cs.NE': 'Neural Computing',
-            'stat.ML': 'Statistical ML'
-        }
-        
-        # Check categories first
-        for cat in categories:
-            if cat in classification_map:
-                return classification_map[cat]
-        
-        # Fallback: keyword-based classification
-        text = (title + " " + abstract).lower()
-        
-        if any(word in text for word in ['vision', 'image', 'visual', 'cnn', 'object detection']):
-            return 'Computer Vision'
-        elif any(word in text for word in ['nlp', 'language', 'text', 'bert', 'transformer']):
-            return 'Natural Language Processing'
-        elif any(word in text for word in ['reinforcement', 'rl', 'agent', 'policy']):
-            return 'Reinforcement Learning'
-        elif any(word in text for word in ['neural', 'deep', 'network', 'cnn', 'rnn']):
-            return 'Deep Learning'
-        else:
-            return 'Machine Learning'
+        return _classify(tuple(categories), title, abstract)
+
+@lru_cache(maxsize=512)
+def _classify(categories: tuple, title: str, abstract: str) -> str:
+    """Memoized classification shared by all tool instances"""
+    
+    # Check categories first
+    for cat in categories:
+        if cat in _CLASSIFICATION_MAP:
+            return _CLASSIFICATION_MAP[cat]
+    
+    # Fallback: keyword-based classification. Keep the highest-priority
+    # category seen, stopping early once the top one has matched
+    best = len(_KEYWORD_CATEGORIES)
+    for match in _KEYWORD_PATTERN.finditer(title + " " + abstract):
+        best = min(best, int(match.lastgroup[1:]))
+        if best == 0:
+            break
+    
+    if best < len(_KEYWORD_CATEGORIES):
+        return _KEYWORD_CATEGORIES[best][0]
+    return 'Machine Learning'
 
 class HuggingFaceSupplementTool(BaseTool):
     name: str = "HuggingFace Supplement"
@@ -163,27 +233,30 @@ class HuggingFaceSupplementTool(BaseTool):
     def _run(self, limit: int = 3) -> List[Dict]:
         """Get trending papers from HF RSS as supplement"""
         
+        if limit <= 0:
+            return []
+        
         rss_url = "https://jamesg.blog/hf-papers.xml"
         logging.info(f"Fetching {limit} papers from HuggingFace RSS feed")
         
         try:
-            feed = feedparser.parse(rss_url)
+            response = get_session().get(rss_url, timeout=30)
+            response.raise_for_status()
             papers = []
+            fetched_at = datetime.now(timezone.utc).isoformat()
             
-            for entry in feed.entries[:limit]:
+            for entry in self._parse_feed(response.content, limit):
                 try:
                     # Extract and clean the data
-                    title = entry.title.strip()
-                    abstract = entry.get('summary', '').strip()
-                    link = entry.link.strip()
+                    title = entry['title'].strip()
+                    abstract = (entry['summary'] or '').strip()
+                    link = entry['link'].strip()
                     
                     # Get authors, default to empty list if none found
-                    authors = []
-                    if 'authors' in entry:
-                        authors = [author.get('name', '').strip() for author in entry.authors if author.get('name')]
+                    authors = [author.strip() for author in entry['authors'] if author]
                     
                     # Get published date
-                    published = entry.get('published', '')
+                    published = entry['published'] or ''
                     
                     paper = {
                         'title': title,
@@ -193,7 +266,7 @@ class HuggingFaceSupplementTool(BaseTool):
                         'authors': authors,
                         'primary_category': 'Trending Research',
                         'source': 'huggingface_trending',
-                        'fetched_at': datetime.now().isoformat(),
+                        'fetched_at': fetched_at,
                         'technical_summary': abstract[:500] + '...' if len(abstract) > 500 else abstract  # Initial technical summary
                     }
                     
@@ -210,6 +283,50 @@ class HuggingFaceSupplementTool(BaseTool):
         except Exception as e:
             logging.error(f"Error fetching HF trending: {str(e)}")
             return []
+    
+    @staticmethod
+    def _parse_feed(content: bytes, limit: int) -> List[Dict]:
+        """
+        Read the first limit items of the feed
+        
+        The feed is plain RSS 2.0, so ElementTree is enough; feedparser is
+        only used when the document isn't RSS or isn't well-formed.
+        """
+        try:
+            items = ET.fromstring(content).findall('channel/item')
+        except ET.ParseError as e:
+            logging.warning(f"RSS parse failed, falling back to feedparser: {str(e)}")
+            items = []
+        
+        if not items:
+            return [
+                {
+                    'title': entry.get('title'),
+                    'summary': entry.get('summary'),
+                    'link': entry.get('link'),
+                    'published': entry.get('published'),
+                    'authors': [author.get('name') for author in entry.get('authors', [])],
+                }
+                for entry in feedparser.parse(content).entries[:limit]
+            ]
+        
+        return [
+            {
+                'title': item.findtext('title'),
+                'summary': item.findtext('description'),
+                'link': item.findtext('link'),
+                'published': item.findtext('pubDate'),
+                'authors': [
+                    author.text
+                    for author in item.findall('author') + item.findall(f'{_DC}creator')
+                ],
+            }
+            for item in items[:limit]
+        ]
+
+# Share of SmartResearchFetcher's limit filled from ArXiv; the rest comes
+# from HuggingFace trending papers
+ARXIV_SHARE = 0.8
 
 class SmartResearchFetcher(BaseTool):
     name: str = "Smart Research Fetcher"
@@ -217,53 +334,111 @@ class SmartResearchFetcher(BaseTool):
     arxiv_tool: Optional[OptimizedArXivTool] = Field(default=None)
     hf_tool: Optional[HuggingFaceSupplementTool] = Field(default=None)
     
+    # Results shared by every fetcher in the process, keyed by (total_limit, day)
+    _result_cache: ClassVar[Dict[Tuple[int, str], Tuple[float, str]]] = {}
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.arxiv_tool = OptimizedArXivTool()
         self.hf_tool = HuggingFaceSupplementTool()
     
-    def _run(self, total_limit: int = 5) -> List[Dict]:
+    def _run(self, total_limit: int = 5) -> str:
         """
-        Smart fetching strategy:
-        - If total_limit is 0, fetch only from HuggingFace
-        - Otherwise, fetch from both sources
+        Smart fetching strategy (returns the papers as a JSON string):
+        - The limit is split between ArXiv (ARXIV_SHARE, at least one paper)
+          and HuggingFace trending papers (the rest)
+        - ArXiv and HuggingFace are queried concurrently, so the fetch stage
+          takes as long as the slowest source rather than the sum of both
+        - A source whose share is 0 is not queried
+        - A failing source is logged and skipped
+        - Results are reused for an hour within the same day, but only when
+          every queried source returned its full share; the tools turn
+          failures into empty lists, so a short result may be a failure
+        - Nothing is fetched when total_limit is 0
         """
-        all_papers = []
+        if total_limit <= 0:
+            return dumps([])
         
-        # Fetch from HuggingFace
-        try:
-            hf_papers = self.hf_tool._run(limit=total_limit)
-            if isinstance(hf_papers, list):
-                all_papers.extend(hf_papers)
-                logging.info(f"Successfully fetched {len(hf_papers)} papers from HuggingFace")
-        except Exception as e:
-            logging.error(f"HF fetch failed: {e}")
+        cache_key = (total_limit, date.today().isoformat())
+        cached = self._result_cache.get(cache_key)
+        if cached is not None and time.monotonic() - cached[0] < _RESULT_TTL:
+            logging.info(f"Reusing fetched papers for limit {total_limit} from earlier today")
+            return cached[1]
+        
+        fetched = []
+        complete = True
+        
+        arxiv_count = max(1, int(total_limit * ARXIV_SHARE))
+        hf_count = total_limit - arxiv_count
+        sources = {
+            source: (fetch, count)
+            for source, fetch, count in (
+                ('ArXiv', self.arxiv_tool._run, arxiv_count),
+                ('HuggingFace', self.hf_tool._run, hf_count),
+            )
+            if count > 0
+        }
+        
+        # Both fetches are independent network I/O, so run them side by side
+        with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+            futures = {
+                source: executor.submit(fetch, limit=count)
+                for source, (fetch, count) in sources.items()
+            }
+            
+            for source, future in futures.items():
+                try:
+                    papers = future.result()
+                    if isinstance(papers, list):
+                        fetched.append(papers)
+                        logging.info(f"Successfully fetched {len(papers)} papers from {source}")
+                        if len(papers) < sources[source][1]:
+                            complete = False
+                    else:
+                        complete = False
+                except Exception as e:
+                    logging.error(f"{source} fetch failed: {e}")
+                    complete = False
         
-        # Remove duplicates based on title similarity
-        unique_papers = self._deduplicate_papers(all_papers)
+        # Remove duplicates based on title similarity, stopping as soon as
+        # total_limit unique papers have been found
+        unique_papers = list(islice(self._deduplicate_papers(chain.from_iterable(fetched)), total_limit))
         
         logging.info(f"Total unique papers after deduplication: {len(unique_papers)}")
-        return unique_papers[:total_limit]
+        # Hand the next agent JSON rather than letting CrewAI str() the list
+        result = dumps(unique_papers)
+        
+        if complete and unique_papers:
+            # Drop entries from previous days so the cache stays small
+            for key in [key for key in self._result_cache if key[1] != cache_key[1]]:
+                self._result_cache.pop(key, None)
+            self._result_cache[cache_key] = (time.monotonic(), result)
+        return result
     
-    def _deduplicate_papers(self, papers: List[Dict]) -> List[Dict]:
-        """Remove duplicate papers based on title similarity"""
+    def _deduplicate_papers(self, papers: Iterable[Dict]) -> Iterator[Dict]:
+        """Lazily yield papers whose titles are not similar to an earlier one"""
         
-        unique_papers = []
-        seen_titles = []
+        seen_shingles = []
         
         for paper in papers:
-            title = paper.get('title', '').lower()
+            shingles = self._shingles(paper.get('title', ''))
             
-            # Check if similar title already exists
-            is_duplicate = False
-            for seen_title in seen_titles:
-                similarity = SequenceMatcher(None, title, seen_title).ratio()
-                if similarity > 0.8:  # 80% similarity threshold
-                    is_duplicate = True
-                    break
+            # Jaccard similarity of word bigrams; set ops are hash lookups
+            # instead of a full string alignment per pair of titles
+            # Empty titles only match each other, as with the old ratio
+            is_duplicate = any(
+                (len(shingles & seen) / len(shingles | seen) if shingles or seen else 1.0) > 0.8  # 80% similarity threshold
+                for seen in seen_shingles
+            )
             
             if not is_duplicate:
-                unique_papers.append(paper)
-                seen_titles.append(title)
-        
-        return unique_papers 
\ No newline at end of file
+                seen_shingles.append(shingles)
+                yield paper
+    
+    @staticmethod
+    def _shingles(title: str) -> frozenset:
+        """Word 2-shingles of a lowercased title (single words for one-word titles)"""
+        tokens = _TITLE_WORD.findall(title.lower())
+        if len(tokens) < 2:
+            return frozenset(tokens)
+        return frozenset(zip(tokens, tokens[1:]))
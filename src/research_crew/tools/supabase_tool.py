@@ -1,13 +1,57 @@
 from crewai.tools import BaseTool
-from supabase import create_client, Client
+from supabase import AsyncClient, Client, acreate_client, create_client
+import asyncio
+import copy
 import os
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, List, Set
 from pydantic import PrivateAttr
 from dotenv import load_dotenv
 import logging
 
 load_dotenv()
 
+__all__ = ['SupabaseTool', 'get_supabase_client', 'get_async_supabase_client']
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_CHECK_CHUNK_SIZE = 500
+INSERT_CHUNK_SIZE = 500
+
+# Required paper fields with the default stored when one is missing
+_REQUIRED_DEFAULTS = (
+    ('title', ''),
+    ('abstract', ''),
+    ('authors', []),
+    ('primary_category', ''),
+    ('technical_summary', ''),
+)
+
+_OPTIONAL_FIELDS = frozenset((
+    'paper_url',
+    'key_contributions',
+    'methodology',
+    'significance',
+    'practical_applications',
+    'limitations',
+    'difficulty_level',
+))
+
+@lru_cache(maxsize=None)
+def get_supabase_client() -> Client:
+    """Process-wide Supabase client, reused by every tool instance and scheduled run"""
+    return create_client(
+        os.getenv('SUPABASE_URL'),
+        os.getenv('SUPABASE_ANON_KEY')
+    )
+
+async def get_async_supabase_client() -> AsyncClient:
+    """Async Supabase client for callers running inside an event loop"""
+    return await acreate_client(
+        os.getenv('SUPABASE_URL'),
+        os.getenv('SUPABASE_ANON_KEY')
+    )
+
 class SupabaseTool(BaseTool):
     name: str = "Supabase Manager"
     description: str = "Manages research papers storage in Supabase"
@@ -16,101 +60,126 @@ class SupabaseTool(BaseTool):
 
     def __init__(self):
         super().__init__()
-        self._supabase = create_client(
-            os.getenv('SUPABASE_URL'),
-            os.getenv('SUPABASE_ANON_KEY')
-        )
+        self._supabase = get_supabase_client()
     
     def _run(self, papers_data: List[Dict]) -> str:
         """Store papers and summaries in Supabase"""
         
+        stored = 0
         try:
-            logging.info(f"Received {len(papers_data)} papers for storage")
+            cleaned_papers = self._clean_papers(papers_data)
+            if not cleaned_papers:
+                return "No valid papers to store"
             
-            # Validate and clean data before insertion
-            cleaned_papers = []
-            for i, paper in enumerate(papers_data):
-                logging.info(f"Processing paper {i+1}: {paper.get('title', 'No title')}")
-                cleaned_paper = self._clean_paper_data(paper)
-                if cleaned_paper:
-                    cleaned_papers.append(cleaned_paper)
-                    logging.info(f"Successfully cleaned paper {i+1}")
-                else:
-                    logging.warning(f"Failed to clean paper {i+1}")
+            # Upsert on the unique paper_url so papers stored by an earlier
+            # run are skipped server-side without a separate duplicate check.
+            # Bounded chunks keep each request under PostgREST payload limits
+            # and avoid one long-running transaction for big batches
+            for chunk in self._chunks(cleaned_papers):
+                self._supabase.table('research_papers').upsert(
+                    chunk, on_conflict='paper_url', ignore_duplicates=True
+                ).execute()
+                stored += len(chunk)
             
+            logger.info("Successfully stored %d papers", stored)
+            return f"Successfully stored {stored} papers"
+        except Exception as e:
+            error_msg = str(e)
+            logger.error("Error storing papers after %d stored: %s", stored, error_msg)
+            return f"Error storing papers ({stored} stored before the failure): {error_msg}"
+    
+    async def _arun(self, papers_data: List[Dict]) -> str:
+        """Store papers without blocking the event loop, upserting all chunks concurrently.
+
+        Only for callers that are already async, such as an async entry point
+        awaiting the tool directly; the crew runs synchronously and uses _run.
+        """
+        try:
+            cleaned_papers = self._clean_papers(papers_data)
             if not cleaned_papers:
-                logging.error("No valid papers after cleaning")
                 return "No valid papers to store"
             
-            logging.info(f"Attempting to store {len(cleaned_papers)} cleaned papers")
+            # The async client's HTTP pool is bound to the running event loop,
+            # so it is created per call rather than shared like the sync one,
+            # and closed again before returning
+            client = await get_async_supabase_client()
+            try:
+                chunks = self._chunks(cleaned_papers)
+                await asyncio.gather(*(
+                    client.table('research_papers').upsert(
+                        chunk, on_conflict='paper_url', ignore_duplicates=True
+                    ).execute()
+                    for chunk in chunks
+                ))
+            finally:
+                await client.postgrest.aclose()
             
-            # Insert papers into database
-            result = self._supabase.table('research_papers').insert(cleaned_papers).execute()
-            logging.info(f"Successfully stored {len(cleaned_papers)} papers")
+            logger.info("Successfully stored %d papers", len(cleaned_papers))
             return f"Successfully stored {len(cleaned_papers)} papers"
         except Exception as e:
-            error_msg = str(e)
-            logging.error(f"Error storing papers: {error_msg}")
-            return f"Error storing papers: {error_msg}"
+            logger.error("Error storing papers: %s", e)
+            return f"Error storing papers: {str(e)}"
+    
+    def _clean_papers(self, papers_data: List[Dict]) -> List[Dict]:
+        """Validate and clean papers before insertion, dropping invalid ones"""
+        logger.info("Received %d papers for storage", len(papers_data))
+        
+        cleaned_papers = []
+        for i, paper in enumerate(papers_data):
+            cleaned_paper = self._clean_paper_data(paper)
+            if cleaned_paper:
+                cleaned_papers.append(cleaned_paper)
+                logger.debug("Cleaned paper %d: %s", i + 1, cleaned_paper['title'])
+            else:
+                logger.warning("Failed to clean paper %d: %s", i + 1, paper.get('title', 'No title'))
+        
+        if cleaned_papers:
+            logger.info("Attempting to store %d cleaned papers", len(cleaned_papers))
+        else:
+            logger.error("No valid papers after cleaning")
+        return cleaned_papers
+    
+    @staticmethod
+    def _chunks(papers: List[Dict]) -> List[List[Dict]]:
+        """Split papers into upsert requests of at most INSERT_CHUNK_SIZE rows"""
+        return [papers[start:start + INSERT_CHUNK_SIZE] for start in range(0, len(papers), INSERT_CHUNK_SIZE)]
     
     def _clean_paper_data(self, paper: Dict) -> Dict:
         """Clean and validate paper data before storage"""
-        # Map of required fields and their types
-        required_fields = {
-            'title': str,
-            'abstract': str,
-            'authors': list,
-            'primary_category': str,
-            'technical_summary': str
-        }
-        
+        # Required fields fall back to an empty value of their type; the copy
+        # keeps cleaned papers from sharing one default authors list
         cleaned_paper = {}
-        
-        # Log the incoming paper data
-        logging.info(f"Cleaning paper: {paper.get('title', 'No title')}")
-        
-        # Ensure required fields exist and have correct types
-        for field, field_type in required_fields.items():
+        for field, default in _REQUIRED_DEFAULTS:
             value = paper.get(field)
             if value is None:
-                logging.warning(f"Missing required field: {field}")
-                if field_type == list:
-                    cleaned_paper[field] = []
-                elif field_type == str:
-                    cleaned_paper[field] = ''
-                else:
-                    cleaned_paper[field] = None
-            else:
-                cleaned_paper[field] = value
-                logging.info(f"Field {field} validated")
+                logger.warning("Missing required field: %s", field)
+                value = copy.copy(default)
+            cleaned_paper[field] = value
         
         # Add optional fields if they exist
-        optional_fields = [
-            'key_contributions',
-            'methodology',
-            'significance',
-            'practical_applications',
-            'limitations',
-            'difficulty_level'
-        ]
-        
-        for field in optional_fields:
-            if field in paper:
-                cleaned_paper[field] = paper[field]
-                logging.info(f"Added optional field: {field}")
+        cleaned_paper.update({field: paper[field] for field in _OPTIONAL_FIELDS & paper.keys()})
         
         # Validate the cleaned paper
         if not cleaned_paper.get('title') or not cleaned_paper.get('abstract'):
-            logging.error("Paper missing essential fields after cleaning")
+            logger.error("Paper missing essential fields after cleaning")
             return None
             
         return cleaned_paper
             
     def check_duplicate(self, paper_url: str) -> bool:
         """Check if a paper already exists in the database"""
+        return paper_url in self.check_duplicates([paper_url])
+
+    def check_duplicates(self, paper_urls: List[str]) -> Set[str]:
+        """Return the subset of paper_urls already stored, using one query per chunk of URLs"""
+        existing = set()
+        urls = list(dict.fromkeys(url for url in paper_urls if url))
         try:
-            result = self._supabase.table('research_papers').select('id').eq('paper_url', paper_url).execute()
-            return len(result.data) > 0
+            # Chunked so the in.(...) filter stays under URL length limits
+            for start in range(0, len(urls), DUPLICATE_CHECK_CHUNK_SIZE):
+                chunk = urls[start:start + DUPLICATE_CHECK_CHUNK_SIZE]
+                result = self._supabase.table('research_papers').select('paper_url').in_('paper_url', chunk).execute()
+                existing.update(row['paper_url'] for row in result.data)
         except Exception as e:
-            logging.error(f"Error checking duplicate: {str(e)}")
-            return False 
\ No newline at end of file
+            logger.error("Error checking duplicates: %s", e)
+        return existing 
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Small on-disk JSON cache for results of slow network calls
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+CACHE_ROOT = Path(os.getenv('RESEARCH_CREW_CACHE_DIR', Path.home() / '.cache' / 'research_crew'))
+
+
+class DiskCache:
+    """JSON file cache with a fixed time-to-live, one file per key"""
+
+    def __init__(self, namespace: str, ttl: float):
+        """
+        Args:
+            namespace: Sub-directory of the cache root holding this cache's entries
+            ttl: Seconds an entry stays valid after it was written
+        """
+        self.directory = CACHE_ROOT / namespace
+        self.ttl = ttl
+        self._pruned = False
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired"""
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable cache entry {path}: {str(e)}")
+            return None
+
+    def prune(self) -> None:
+        """Delete every expired entry, including ones that are never read again"""
+        cutoff = time.time() - self.ttl
+        try:
+            for path in self.directory.glob('*.json'):
+                if path.stat().st_mtime < cutoff:
+                    path.unlink(missing_ok=True)
+        except OSError as e:
+            logging.warning(f"Could not prune cache {self.directory}: {str(e)}")
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value under key"""
+        # Sweep out stale entries once per process, on the first write
+        if not self._pruned:
+            self._pruned = True
+            self.prune()
+        path = self._path(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(value, f)
+            # Atomic swap so concurrent readers never see a half-written file
+            os.replace(tmp_path, path)
+        except (OSError, TypeError) as e:
+            logging.warning(f"Could not write cache entry {path}: {str(e)}")
@@ -0,0 +1,35 @@
+"""
+Shared HTTP session for the research paper fetchers
+"""
+
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+USER_AGENT = 'research-crew/0.1.0 (+https://github.com/SriHarshitha88/hf-papers)'
+
+
+@lru_cache(maxsize=None)
+def get_session() -> requests.Session:
+    """Return a process-wide session so keep-alive connections are reused across runs"""
+    session = requests.Session()
+    # Feeds are XML text and compress well; a descriptive User-Agent is
+    # what the ArXiv API terms ask clients to send
+    session.headers.update({
+        'Accept-Encoding': 'gzip, deflate',
+        'User-Agent': USER_AGENT,
+    })
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+        ),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
@@ -0,0 +1,18 @@
+"""
+JSON encoding for data handed between crew agents
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+
+def dumps(obj: Any) -> str:
+    """Serialize tool output to a compact JSON string"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
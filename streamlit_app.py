@@ -1,29 +1,30 @@
 import streamlit as st
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import random
-from collections import Counter
+from collections import Counter, OrderedDict
 import requests
 import json
 from supabase import create_client, Client
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+import html
 import re
 import os
 import sys
+import threading
 from pathlib import Path
 
-# ✅ Add src/research_crew to sys.path to enable absolute imports
-SRC_PATH = Path(__file__).resolve().parent / "src" / "research_crew"
+# ✅ Add src to sys.path so the research_crew package is importable without installing it
+SRC_PATH = Path(__file__).resolve().parent / "src"
 if str(SRC_PATH) not in sys.path:
     sys.path.append(str(SRC_PATH))
 
-# ✅ Now you can use imports like this (no dots!)
+# ✅ Import through the package so every module is loaded exactly once
 try:
-    from crew import ResearchCrew
+    from research_crew.crew import ResearchCrew
+    from research_crew.tools.summarizer_tool import EnhancedSummarizerTool
 except ImportError as e:
     st.error(f"Could not import ResearchCrew: {e}")
     st.stop()
@@ -55,106 +56,302 @@ def init_supabase():
         st.error(f"Error connecting to Supabase: {e}")
         return None
 
-def fetch_papers_from_db(supabase: Client, limit: int = 50) -> List[Dict]:
-    """Fetch papers from Supabase database"""
+# Separators of tags and contributions stored as a single string
+_SPLIT_COMMA = re.compile(r'\s*,\s*')
+_SPLIT_NL = re.compile(r'\n+')
+
+# Columns the cards and dashboard read; leaves out the summary fields the
+# app never shows and the search_vector used only inside Postgres
+PAPER_COLS = ('id,title,abstract,authors,primary_category,technical_summary,key_contributions,'
+              'methodology,significance,paper_url,arxiv_id,published_date,created_at')
+
+# How often a running crew job is polled for completion
+CREW_POLL_SECONDS = 5
+
+# Paper cards rendered per page
+PAGE_SIZE = 10
+
+# Sort choices mapped to (column, descending) for the database query;
+# Relevance keeps the full-text rank order of a search
+SORT_OPTIONS = {
+    "Newest First": ('created_at', True),
+    "Relevance": (None, True),
+    "Oldest First": ('created_at', False),
+    "Title A-Z": ('title', False),
+    "Category": ('primary_category', False),
+}
+# Date filter choices mapped to how many days back they reach
+DATE_FILTER_DAYS = {"All Time": None, "Today": 0, "This Week": 7, "This Month": 30}
+
+# Last successful result per query, shown when a database refresh fails;
+# bounded like the query caches so it cannot grow without limit
+_LAST_GOOD_MAX = 64
+_LAST_GOOD: "OrderedDict[Tuple, List[Dict]]" = OrderedDict()
+_LAST_GOOD_LOCK = threading.Lock()
+
+def _remember_papers(key: Tuple, papers: List[Dict]) -> List[Dict]:
+    """Record papers as the last good result for key, evicting the oldest query"""
+    with _LAST_GOOD_LOCK:
+        _LAST_GOOD[key] = papers
+        _LAST_GOOD.move_to_end(key)
+        while len(_LAST_GOOD) > _LAST_GOOD_MAX:
+            _LAST_GOOD.popitem(last=False)
+    return papers
+
+def _last_good_papers(key: Tuple) -> Optional[List[Dict]]:
+    """The last good result for key, if one has been recorded"""
+    with _LAST_GOOD_LOCK:
+        return _LAST_GOOD.get(key)
+
+@st.cache_data(ttl=300, max_entries=64, show_spinner=False)
+def query_papers(_supabase: Client, categories: Optional[Tuple[str, ...]] = None,
+                 search: Optional[str] = None, since: Optional[str] = None,
+                 order_by: Optional[str] = 'created_at', descending: bool = True,
+                 limit: int = 50) -> List[Dict]:
+    """Fetch papers with category, keyword and date filters and the sort applied by Postgres"""
+    if search:
+        # Full-text match over the GIN-indexed search_vector, ranked by
+        # relevance; the filters below are applied to its result rows
+        query = _supabase.rpc('search_papers', {'q': search}).select(PAPER_COLS)
+    else:
+        query = _supabase.table('research_papers').select(PAPER_COLS)
+        order_by = order_by or 'created_at'
+    if categories is not None:
+        query = query.in_('primary_category', list(categories))
+    if since:
+        query = query.gte('created_at', since)
+    if order_by:
+        query = query.order(order_by, desc=descending)
+        # Break ties newest first so equal titles or categories keep a
+        # stable order between reruns and pages
+        if order_by != 'created_at':
+            query = query.order('created_at', desc=True)
+    response = query.limit(limit).execute()
+    return response.data if response.data else []
+
+def _query_key(limit: int, categories: Optional[List[str]], search: Optional[str],
+               since: Optional[str], order_by: Optional[str], descending: bool) -> Tuple:
+    """Positional arguments for the cached query functions, in their order"""
+    return (
+        tuple(categories) if categories is not None else None,
+        search or None,
+        since,
+        order_by,
+        descending,
+        limit
+    )
+
+def fetch_papers_from_db(supabase: Client, limit: int = 50,
+                         categories: Optional[List[str]] = None,
+                         search: Optional[str] = None,
+                         since: Optional[str] = None,
+                         order_by: Optional[str] = 'created_at',
+                         descending: bool = True) -> List[Dict]:
+    """Fetch papers from Supabase database, optionally filtered and sorted server-side"""
+    key = _query_key(limit, categories, search, since, order_by, descending)
     try:
-        response = supabase.table('research_papers')\
-            .select('*')\
-            .order('created_at', desc=True)\
-            .limit(limit)\
-            .execute()
-        
-        return response.data if response.data else []
+        return _remember_papers(('raw',) + key, query_papers(supabase, *key))
     except Exception as e:
+        papers = _last_good_papers(('raw',) + key)
+        if papers is not None:
+            st.warning(f"Showing previously loaded papers, database refresh failed: {e}")
+            return papers
         st.error(f"Error fetching papers from database: {e}")
         return []
 
-def search_papers_in_db(supabase: Client, query: str, limit: int = 20) -> List[Dict]:
-    """Search papers in database by title or summary"""
+@st.cache_data(ttl=300, max_entries=64, show_spinner=False)
+def load_processed_papers(_supabase: Client, categories: Optional[Tuple[str, ...]] = None,
+                          search: Optional[str] = None, since: Optional[str] = None,
+                          order_by: Optional[str] = 'created_at', descending: bool = True,
+                          limit: int = 50) -> List[Dict]:
+    """Fetch papers and normalize them for display, once per distinct query"""
+    raw = query_papers(_supabase, categories, search, since, order_by, descending, limit)
+    return [process_crew_paper(paper) for paper in raw]
+
+def load_papers(supabase: Client, limit: int = 50,
+                categories: Optional[List[str]] = None,
+                search: Optional[str] = None,
+                since: Optional[str] = None,
+                order_by: Optional[str] = 'created_at',
+                descending: bool = True) -> List[Dict]:
+    """Papers ready for display, with the same filters as fetch_papers_from_db"""
+    key = _query_key(limit, categories, search, since, order_by, descending)
     try:
-        response = supabase.table('research_papers')\
-            .select('*')\
-            .or_(f'title.ilike.%{query}%,summary.ilike.%{query}%,key_contributions.ilike.%{query}%')\
-            .order('created_at', desc=True)\
-            .limit(limit)\
-            .execute()
-        
-        return response.data if response.data else []
+        return _remember_papers(('display',) + key, load_processed_papers(supabase, *key))
     except Exception as e:
-        st.error(f"Error searching papers: {e}")
+        papers = _last_good_papers(('display',) + key)
+        if papers is not None:
+            st.warning(f"Showing previously loaded papers, database refresh failed: {e}")
+            return papers
+        st.error(f"Error fetching papers from database: {e}")
         return []
 
+def clear_paper_cache():
+    """Drop cached query results so the next load reads the database"""
+    query_papers.clear()
+    load_processed_papers.clear()
+
+def search_papers_in_db(supabase: Client, query: str, limit: int = 20) -> List[Dict]:
+    """Search papers in database by title or summary"""
+    return fetch_papers_from_db(supabase, limit=limit, search=query)
+
 def filter_papers_by_category(supabase: Client, categories: List[str], limit: int = 50) -> List[Dict]:
     """Filter papers by categories"""
-    try:
-        category_filter = ','.join([f'"{cat}"' for cat in categories])
-        response = supabase.table('research_papers')\
-            .select('*')\
-            .in_('category', categories)\
-            .order('created_at', desc=True)\
-            .limit(limit)\
-            .execute()
-        
-        return response.data if response.data else []
-    except Exception as e:
-        st.error(f"Error filtering papers: {e}")
-        return []
+    return fetch_papers_from_db(supabase, limit=limit, categories=categories)
+
+@st.cache_data(ttl=300, max_entries=64, show_spinner=False)
+def query_papers_by_date(_supabase: Client, start_date: str, end_date: str) -> List[Dict]:
+    """Fetch papers created within a date range"""
+    response = _supabase.table('research_papers')\
+        .select(PAPER_COLS)\
+        .gte('created_at', start_date)\
+        .lte('created_at', end_date)\
+        .order('created_at', desc=True)\
+        .execute()
+    
+    return response.data if response.data else []
 
 def get_papers_by_date_range(supabase: Client, start_date: str, end_date: str) -> List[Dict]:
     """Get papers within a date range"""
     try:
-        response = supabase.table('research_papers')\
-            .select('*')\
-            .gte('created_at', start_date)\
-            .lte('created_at', end_date)\
-            .order('created_at', desc=True)\
-            .execute()
-        
-        return response.data if response.data else []
+        return query_papers_by_date(supabase, start_date, end_date)
     except Exception as e:
         st.error(f"Error fetching papers by date: {e}")
         return []
 
+def tag_cloud_html(tags: List[str]) -> str:
+    """Tag cloud as HTML spans, sized by how often each tag occurs"""
+    return ' '.join(
+        f'<span style="font-size:{10 + 2 * count}px;padding:2px 6px;margin:2px;'
+        f'background:#e1f5fe;border-radius:10px;display:inline-block">{html.escape(tag)}</span>'
+        for tag, count in Counter(tags).items()
+    )
+
+def tag_html(tags: List[str]) -> str:
+    """The card's first four tags as one row of HTML badges"""
+    return ' '.join(
+        f'<span style="background-color: #e1f5fe; padding: 2px 8px; border-radius: 12px; font-size: 12px;">{html.escape(tag)}</span>'
+        for tag in tags[:4]
+    )
+
+def _to_list(value, separator: re.Pattern = _SPLIT_COMMA) -> List:
+    """Coerce a stored list field to a list, splitting strings on separator"""
+    if not value:
+        return []
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str):
+        return [part.strip() for part in separator.split(value) if part.strip()]
+    return [value]
+
 def process_crew_paper(paper: Dict) -> Dict:
     """Process paper data from CrewAI crew structure"""
     processed_paper = {
         'id': paper.get('id', ''),
         'title': paper.get('title', 'Untitled'),
-        'authors': paper.get('authors', []) if isinstance(paper.get('authors'), list) else [paper.get('authors', 'Unknown')],
+        'authors': _to_list(paper['authors']) if paper.get('authors') is not None else ['Unknown'],
         'summary': paper.get('summary', paper.get('technical_summary', 'Summary not available')),
         'date': paper.get('published_date', paper.get('created_at', datetime.now().strftime('%Y-%m-%d'))),
-        'url': paper.get('url', paper.get('arxiv_url', '')),
-        'category': paper.get('category', 'Unknown'),
-        'contributions': paper.get('key_contributions', []) if isinstance(paper.get('key_contributions'), list) else [paper.get('key_contributions', 'Contributions analysis pending')],
+        'url': paper.get('url') or paper.get('paper_url') or paper.get('arxiv_url', ''),
+        'category': paper.get('category') or paper.get('primary_category') or 'Unknown',
+        'contributions': (_to_list(paper['key_contributions'], _SPLIT_NL)
+                          if paper.get('key_contributions') is not None
+                          else ['Contributions analysis pending']),
         'methodology': paper.get('methodology', 'Methodology details extracted from analysis'),
         'significance': paper.get('significance', 'Significance assessment completed by AI analysis'),
-        'tags': paper.get('tags', []) if isinstance(paper.get('tags'), list) else [],
+        'tags': _to_list(paper.get('tags')),
         'created_at': paper.get('created_at', datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
         'arxiv_id': paper.get('arxiv_id', ''),
         'technical_summary': paper.get('technical_summary', paper.get('summary', '')),
+        'abstract': paper.get('abstract', ''),
         'confidence_score': paper.get('confidence_score', 0.0)
     }
     
-    # Process tags if they're stored as a string
-    if isinstance(processed_paper['tags'], str):
-        processed_paper['tags'] = [tag.strip() for tag in processed_paper['tags'].split(',') if tag.strip()]
-    
-    # Process contributions if stored as string
-    if isinstance(processed_paper['contributions'], str):
-        processed_paper['contributions'] = [contrib.strip() for contrib in processed_paper['contributions'].split('\n') if contrib.strip()]
+    # Display strings are built once here, so rendering a card on a rerun
+    # only substitutes them
+    authors = processed_paper['authors']
+    processed_paper['authors_display'] = ', '.join(authors[:3]) + ('...' if len(authors) > 3 else '')
+    processed_paper['summary_word_count'] = len(processed_paper['summary'].split())
+    processed_paper['tag_html'] = tag_html(processed_paper['tags'])
+    processed_paper['tag_cloud_html'] = tag_cloud_html(processed_paper['tags'])
     
     return processed_paper
 
-def run_crew_analysis():
-    """Run the CrewAI research crew to fetch and analyze new papers"""
-    try:
-        crew = ResearchCrew()
-        result = crew.run()
-        return result
-    except Exception as e:
-        st.error(f"Error running crew analysis: {e}")
-        return None
+@st.cache_resource
+def get_summarizer() -> EnhancedSummarizerTool:
+    """Summarizer shared by all sessions for on-demand summaries"""
+    return EnhancedSummarizerTool()
+
+@st.cache_resource
+def get_crew() -> ResearchCrew:
+    """Crew shared by all sessions, so configs, agents and tools are set up once"""
+    crew = ResearchCrew()
+    # One shared crew object must not run twice at once; agents and tasks
+    # keep per-run state
+    crew.run_lock = threading.Lock()
+    return crew
+
+class CrewJob:
+    """A crew run on a background thread, so the app stays usable while it works"""
+    
+    def __init__(self, crew: ResearchCrew):
+        # The crew comes from get_crew() in the script run; cache_resource
+        # needs the ScriptRunContext that the background thread lacks
+        self.crew = crew
+        self.result = None
+        self.error: Optional[Exception] = None
+        self.started_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self.reported = False
+        # True while another session's run holds the shared crew
+        self.waiting = True
+        # The thread only touches this object; Streamlit APIs and session
+        # state are not available outside the script run
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        try:
+            with self.crew.run_lock:
+                self.waiting = False
+                self.started_at = datetime.now()
+                self.result = self.crew.run()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished_at = datetime.now()
+    
+    @property
+    def running(self) -> bool:
+        return self.finished_at is None
+
+def crew_job_status(job: CrewJob):
+    """Report on a background crew run, reloading papers once when it finishes"""
+    if job.running and job.waiting:
+        st.info("⏳ Queued: waiting for another session's crew run to finish...")
+        return
+    if job.running:
+        elapsed = int((datetime.now() - job.started_at).total_seconds())
+        st.info(f"🤖 Running CrewAI research crew... ({elapsed}s)")
+        return
+    
+    if not job.reported:
+        job.reported = True
+        if job.error is None and job.result:
+            st.session_state.last_fetch = job.finished_at
+            # Force refresh of papers
+            clear_paper_cache()
+        # Rerun the whole app so the new papers load and polling stops
+        st.rerun()
+    
+    if job.error is not None:
+        st.error(f"❌ CrewAI analysis failed: {job.error}")
+    elif job.result:
+        st.success("✅ CrewAI analysis completed!")
+    else:
+        st.error("❌ CrewAI analysis failed")
 
+@st.fragment
 def display_paper_card(paper: Dict, index: int):
     """Display an interactive paper card with crew-generated content"""
     
@@ -165,8 +362,7 @@ def display_paper_card(paper: Dict, index: int):
         
         with col1:
             st.markdown(f"### 🧠 {paper['title']}")
-            authors_display = ', '.join(paper['authors'][:3]) + ('...' if len(paper['authors']) > 3 else '')
-            st.markdown(f"**👥 Authors:** {authors_display}")
+            st.markdown(f"**👥 Authors:** {paper['authors_display']}")
             
         with col2:
             st.markdown(f"**📅 Published:** {paper['date']}")
@@ -181,7 +377,26 @@ def display_paper_card(paper: Dict, index: int):
         
         # Technical Summary (from CrewAI)
         with st.expander("🔬 Technical Summary (AI Generated)", expanded=True):
-            st.write(paper.get('technical_summary', paper['summary']))
+            if paper.get('technical_summary'):
+                st.write(paper['technical_summary'])
+            else:
+                # Stream the summary into the page as tokens arrive, and keep
+                # it for this session so reruns don't call the LLM again
+                streamed = st.session_state.setdefault('streamed_summaries', {})
+                paper_key = paper.get('id') or paper['title']
+                if paper_key in streamed:
+                    st.write(streamed[paper_key])
+                elif paper.get('abstract') and st.button("✨ Generate AI summary", key=f"summarize_{index}"):
+                    # The prompt picks its instructions by primary_category,
+                    # which the processed paper calls category
+                    try:
+                        streamed[paper_key] = st.write_stream(get_summarizer()._summarize_paper_stream(
+                            {**paper, 'primary_category': paper['category']}
+                        ))
+                    except Exception as e:
+                        st.error(f"Error generating summary: {e}")
+                else:
+                    st.write(paper['summary'])
             
         # Key Contributions (from CrewAI analysis)
         with st.expander("🔑 Key Contributions (AI Analyzed)"):
@@ -208,11 +423,7 @@ def display_paper_card(paper: Dict, index: int):
         # Tags and Metadata
         st.markdown("**🏷️ AI-Generated Tags:**")
         if paper.get('tags'):
-            tags_cols = st.columns(min(len(paper['tags']), 4))
-            for i, tag in enumerate(paper['tags'][:4]):
-                with tags_cols[i % len(tags_cols)]:
-                    st.markdown(f'<span style="background-color: #e1f5fe; padding: 2px 8px; border-radius: 12px; font-size: 12px;">{tag}</span>', 
-                              unsafe_allow_html=True)
+            st.markdown(paper['tag_html'], unsafe_allow_html=True)
         
         # Visualization section
         col_viz, col_meta = st.columns([2, 1])
@@ -220,19 +431,8 @@ def display_paper_card(paper: Dict, index: int):
         with col_viz:
             # Word cloud for tags and key terms
             if paper.get('tags'):
-                try:
-                    tags_text = " ".join(paper["tags"])
-                    if len(tags_text) > 0:
-                        wordcloud = WordCloud(width=300, height=150, background_color="white", 
-                                            colormap='viridis').generate(tags_text)
-                        fig, ax = plt.subplots(figsize=(6, 3))
-                        ax.imshow(wordcloud, interpolation='bilinear')
-                        ax.axis("off")
-                        ax.set_title("Tag Cloud", fontsize=12)
-                        st.pyplot(fig)
-                        plt.close()
-                except Exception as e:
-                    st.warning("Could not generate word cloud")
+                st.markdown("**Tag Cloud**")
+                st.markdown(paper['tag_cloud_html'], unsafe_allow_html=True)
         
         with col_meta:
             # Paper metadata
@@ -240,7 +440,7 @@ def display_paper_card(paper: Dict, index: int):
                 st.markdown(f"**🔗 [View Paper]({paper['url']})**")
             
             st.markdown(f"**📊 Authors:** {len(paper['authors'])}")
-            st.markdown(f"**📝 Summary:** {len(paper['summary'].split())} words")
+            st.markdown(f"**📝 Summary:** {paper['summary_word_count']} words")
             st.markdown(f"**🕒 Added:** {paper.get('created_at', 'Unknown')[:10]}")
             
             # Quality indicators
@@ -249,68 +449,84 @@ def display_paper_card(paper: Dict, index: int):
             if paper.get('contributions'):
                 st.markdown("✅ **Contributions Analyzed**")
 
-def show_dashboard(papers: List[Dict]):
+@st.cache_data(ttl=60, max_entries=64, show_spinner=False)
+def query_paper_stats(_supabase: Client, today: str, categories: Optional[Tuple[str, ...]] = None,
+                      since: Optional[str] = None, search: Optional[str] = None) -> Dict:
+    """Dashboard aggregates computed by the paper_stats function in Postgres"""
+    response = _supabase.rpc('paper_stats', {
+        'today': today,
+        'categories': list(categories) if categories is not None else None,
+        'since': since,
+        'q': search,
+    }).execute()
+    return response.data[0] if response.data else {}
+
+def get_paper_stats(supabase: Client, categories: Optional[List[str]] = None,
+                    since: Optional[str] = None, search: Optional[str] = None) -> Dict:
+    """Dashboard aggregates for the papers matching the current filters"""
+    try:
+        return query_paper_stats(
+            supabase,
+            datetime.now().strftime('%Y-%m-%d'),
+            tuple(categories) if categories is not None else None,
+            since,
+            search or None
+        )
+    except Exception as e:
+        st.sidebar.warning(f"Could not load paper statistics: {e}")
+        return {}
+
+def show_dashboard(stats: Dict, papers: List[Dict]):
     """Show analytics dashboard for crew-processed papers"""
-    if not papers:
+    total = stats.get('total', 0)
+    if not total:
         st.sidebar.warning("No papers available")
         return
         
     st.sidebar.markdown("# 📈 CrewAI Dashboard")
     
     # Basic metrics
-    st.sidebar.metric("📚 Total Papers", len(papers))
+    st.sidebar.metric("📚 Total Papers", total)
     
     # Category distribution
-    categories = [p.get('category', 'Unknown') for p in papers]
-    unique_categories = set(categories)
-    st.sidebar.metric("📂 Categories", len(unique_categories))
+    category_counts = stats['per_category']
+    st.sidebar.metric("📂 Categories", len(category_counts))
     
     # Today's papers
-    today = datetime.now().strftime('%Y-%m-%d')
-    today_count = sum(1 for p in papers if p.get("created_at", "")[:10] == today)
-    st.sidebar.metric("🆕 Today's Papers", today_count)
+    st.sidebar.metric("🆕 Today's Papers", stats['today_count'])
     
     # AI-processed papers
-    ai_processed = sum(1 for p in papers if p.get('technical_summary'))
-    st.sidebar.metric("🤖 AI Processed", ai_processed)
+    st.sidebar.metric("🤖 AI Processed", stats['ai_processed'])
     
     # Average summary length
-    if papers:
-        avg_summary_len = round(sum(len(p.get('summary', '').split()) for p in papers) / len(papers), 1)
-        st.sidebar.metric("📝 Avg. Summary Length", f"{avg_summary_len} words")
+    st.sidebar.metric("📝 Avg. Summary Length", f"{round(stats['avg_summary_words'], 1)} words")
     
     # Category distribution chart
-    if len(unique_categories) > 1:
+    if len(category_counts) > 1:
         st.sidebar.markdown("### 📊 Category Distribution")
-        category_counts = Counter(categories)
         fig = px.pie(values=list(category_counts.values()), 
                     names=list(category_counts.keys()),
                     height=300,
                     color_discrete_sequence=px.colors.qualitative.Set3)
         st.sidebar.plotly_chart(fig, use_container_width=True)
     
-    # Popular tags from AI analysis
-    all_tags = []
-    for paper in papers:
-        if paper.get('tags'):
-            all_tags.extend(paper['tags'])
-    
-    if all_tags:
+    # Popular tags from AI analysis, among the loaded papers
+    tag_counts = Counter(tag for paper in papers for tag in paper['tags'])
+    if tag_counts:
         st.sidebar.markdown("### 🏷️ Popular AI Tags")
-        tag_counts = Counter(all_tags)
         top_tags = tag_counts.most_common(5)
         for tag, count in top_tags:
             st.sidebar.markdown(f"• **{tag}**: {count}")
     
     # Processing quality metrics
     st.sidebar.markdown("### 🎯 AI Processing Quality")
-    has_contributions = sum(1 for p in papers if p.get('contributions'))
-    has_methodology = sum(1 for p in papers if p.get('methodology'))
-    has_significance = sum(1 for p in papers if p.get('significance'))
+    has_contributions = stats['has_contributions']
+    has_methodology = stats['has_methodology']
+    has_significance = stats['has_significance']
     
-    st.sidebar.progress(has_contributions / len(papers), text=f"Contributions: {has_contributions}/{len(papers)}")
-    st.sidebar.progress(has_methodology / len(papers), text=f"Methodology: {has_methodology}/{len(papers)}")
-    st.sidebar.progress(has_significance / len(papers), text=f"Significance: {has_significance}/{len(papers)}")
+    st.sidebar.progress(has_contributions / total, text=f"Contributions: {has_contributions}/{total}")
+    st.sidebar.progress(has_methodology / total, text=f"Methodology: {has_methodology}/{total}")
+    st.sidebar.progress(has_significance / total, text=f"Significance: {has_significance}/{total}")
 
 def main():
     st.title("🤖 CrewAI Research Paper Visualizer")
@@ -322,92 +538,92 @@ def main():
         st.stop()
     
     # Initialize session state
-    if 'papers' not in st.session_state:
-        st.session_state.papers = []
     if 'last_fetch' not in st.session_state:
         st.session_state.last_fetch = None
     
     # Sidebar controls
     st.sidebar.markdown("# 🤖 CrewAI Controls")
     
-    # Crew analysis button
+    # Crew analysis button; the crew runs in the background and only one
+    # run per session can be in progress
+    job = st.session_state.get('crew_job')
     col1, col2 = st.sidebar.columns(2)
     with col1:
-        if st.button("🚀 Run CrewAI Analysis", type="primary", help="Fetch new papers and run AI analysis"):
-            with st.spinner("🤖 Running CrewAI research crew..."):
-                result = run_crew_analysis()
-                if result:
-                    st.success("✅ CrewAI analysis completed!")
-                    st.session_state.last_fetch = datetime.now()
-                    # Force refresh of papers
-                    st.session_state.papers = []
-                else:
-                    st.error("❌ CrewAI analysis failed")
+        if st.button("🚀 Run CrewAI Analysis", type="primary", help="Fetch new papers and run AI analysis",
+                     disabled=job is not None and job.running):
+            st.session_state.crew_job = job = CrewJob(get_crew())
     
     with col2:
         if st.button("🔄 Refresh Papers", help="Reload papers from database"):
-            st.session_state.papers = []
+            clear_paper_cache()
             st.rerun()
     
-    # Load papers from database if not in session state
-    if not st.session_state.papers:
-        with st.spinner("📥 Loading papers from database..."):
-            papers = fetch_papers_from_db(supabase, limit=100)
-            if papers:
-                st.session_state.papers = [process_crew_paper(paper) for paper in papers]
-                st.success(f"✅ Loaded {len(papers)} papers from database")
+    if job is not None:
+        with st.sidebar:
+            if job.running:
+                # Poll the job by rerunning only this status fragment
+                st.fragment(crew_job_status, run_every=CREW_POLL_SECONDS)(job)
             else:
-                st.info("No papers found in database. Run CrewAI analysis to fetch papers.")
+                crew_job_status(job)
+    
+    # Query results are cached for 5 minutes across reruns and sessions
+    if st.sidebar.button("🧹 Clear cache", help="Drop cached database results and reload"):
+        st.cache_data.clear()
+        st.rerun()
+    
+    # Load papers from database; cached per query across reruns and sessions
+    with st.spinner("📥 Loading papers from database..."):
+        papers = load_papers(supabase, limit=100)
+    if not papers:
+        st.info("No papers found in database. Run CrewAI analysis to fetch papers.")
     
     # Search and filter controls
-    if st.session_state.papers:
+    if papers:
         st.sidebar.markdown("# 🔍 Search & Filter")
         
-        # Search functionality
-        search_query = st.sidebar.text_input("🔎 Search Papers", 
-                                           placeholder="Search by title, summary, or contributions...")
-        
-        if search_query:
-            with st.spinner("Searching..."):
-                search_results = search_papers_in_db(supabase, search_query)
-                filtered_papers = [process_crew_paper(paper) for paper in search_results]
-        else:
-            filtered_papers = st.session_state.papers
+        # Search functionality; the form sends one query per submit rather
+        # than one per edit of the text box
+        with st.sidebar.form('search_form'):
+            query_input = st.text_input("🔎 Search Papers", 
+                                        value=st.session_state.get('search_query', ''),
+                                        placeholder="Search by title, summary, or abstract...")
+            if st.form_submit_button("Search"):
+                st.session_state.search_query = query_input.strip()
+        search_query = st.session_state.get('search_query', '')
         
         # Category filter
-        all_categories = list(set(p.get('category', 'Unknown') for p in filtered_papers))
+        all_categories = list(dict.fromkeys(p['category'] for p in papers))
         selected_categories = st.sidebar.multiselect("📂 Categories", 
                                                    all_categories, 
                                                    default=all_categories)
         
         # Date filter
         st.sidebar.markdown("📅 Date Range")
-        date_filter = st.sidebar.selectbox("Date Filter", 
-                                         ["All Time", "Today", "This Week", "This Month"])
+        date_filter = st.sidebar.selectbox("Date Filter", list(DATE_FILTER_DAYS))
+        days_back = DATE_FILTER_DAYS[date_filter]
+        since = None
+        if days_back is not None:
+            since = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
         
-        # Apply filters
-        if selected_categories != all_categories:
-            filtered_papers = [p for p in filtered_papers 
-                             if p.get('category', 'Unknown') in selected_categories]
+        # The sort widget is drawn further down; its value is read from
+        # session state here so the sort can be part of the same query
+        sort_column, descending = SORT_OPTIONS[st.session_state.get('sort_by', "Newest First")]
         
-        # Apply date filter
-        if date_filter != "All Time":
-            today = datetime.now()
-            if date_filter == "Today":
-                cutoff = today.strftime('%Y-%m-%d')
-                filtered_papers = [p for p in filtered_papers 
-                                 if p.get('created_at', '')[:10] == cutoff]
-            elif date_filter == "This Week":
-                week_ago = (today - timedelta(days=7)).strftime('%Y-%m-%d')
-                filtered_papers = [p for p in filtered_papers 
-                                 if p.get('created_at', '')[:10] >= week_ago]
-            elif date_filter == "This Month":
-                month_ago = (today - timedelta(days=30)).strftime('%Y-%m-%d')
-                filtered_papers = [p for p in filtered_papers 
-                                 if p.get('created_at', '')[:10] >= month_ago]
+        # Filtering and sorting all run in one Postgres query, so matches
+        # outside the loaded window of newest papers are still found
+        categories = None if selected_categories == all_categories else selected_categories
+        if categories == []:
+            filtered_papers = []
+        else:
+            with st.spinner("Searching..."):
+                filtered_papers = load_papers(supabase, limit=100, categories=categories,
+                                              search=search_query, since=since,
+                                              order_by=sort_column, descending=descending)
         
-        # Show dashboard
-        show_dashboard(filtered_papers)
+        # Show dashboard; counts cover every matching paper, not just the
+        # loaded page, and are aggregated by Postgres
+        stats = get_paper_stats(supabase, categories=categories, since=since, search=search_query) if filtered_papers else {}
+        show_dashboard(stats, filtered_papers)
         
         # Main content area
         if filtered_papers:
@@ -416,28 +632,20 @@ def main():
             # Sorting options
             col1, col2 = st.columns([3, 1])
             with col2:
-                sort_by = st.selectbox("Sort by", 
-                                     ["Newest First", "Oldest First", "Title A-Z", "Category"])
-            
-            # Sort papers
-            if sort_by == "Newest First":
-                filtered_papers.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-            elif sort_by == "Oldest First":
-                filtered_papers.sort(key=lambda x: x.get('created_at', ''))
-            elif sort_by == "Title A-Z":
-                filtered_papers.sort(key=lambda x: x.get('title', '').lower())
-            elif sort_by == "Category":
-                filtered_papers.sort(key=lambda x: x.get('category', ''))
+                st.selectbox("Sort by", list(SORT_OPTIONS), key='sort_by')
             
             # Display stats
             with col1:
-                ai_processed = sum(1 for p in filtered_papers if p.get('technical_summary'))
-                st.markdown(f"**🤖 AI Processed:** {ai_processed}/{len(filtered_papers)} papers")
+                if stats:
+                    st.markdown(f"**🤖 AI Processed:** {stats['ai_processed']}/{stats['total']} papers")
             
             st.markdown("---")
             
-            # Display papers
-            for i, paper in enumerate(filtered_papers):
+            # Display one page of papers; only these cards are rendered
+            page_count = (len(filtered_papers) + PAGE_SIZE - 1) // PAGE_SIZE
+            page = st.number_input("Page", min_value=1, max_value=page_count, value=1) if page_count > 1 else 1
+            start = (page - 1) * PAGE_SIZE
+            for i, paper in enumerate(filtered_papers[start:start + PAGE_SIZE], start):
                 display_paper_card(paper, i)
                 st.markdown("---")
                 
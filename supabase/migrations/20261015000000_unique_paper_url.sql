@@ -0,0 +1,10 @@
+-- Lets SupabaseTool upsert on paper_url and skip papers that are already stored.
+-- Remove existing duplicates before applying, keeping the oldest row per URL;
+-- rows created at the same instant are tie-broken on id so exactly one survives.
+DELETE FROM research_papers a
+USING research_papers b
+WHERE a.paper_url = b.paper_url
+  AND (a.created_at, a.id) > (b.created_at, b.id);
+
+ALTER TABLE research_papers
+    ADD CONSTRAINT research_papers_paper_url_key UNIQUE (paper_url);
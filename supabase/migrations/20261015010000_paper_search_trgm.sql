@@ -0,0 +1,9 @@
+-- Trigram indexes so the Streamlit keyword search (ilike '%term%' on title and
+-- technical_summary) is served by an index instead of a sequential scan.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS research_papers_title_trgm_idx
+    ON research_papers USING GIN (title gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS research_papers_technical_summary_trgm_idx
+    ON research_papers USING GIN (technical_summary gin_trgm_ops);
@@ -0,0 +1,10 @@
+-- Indexes for the Streamlit paper query, which filters on primary_category and
+-- created_at and sorts by created_at (newest or oldest first) or title.
+CREATE INDEX IF NOT EXISTS research_papers_category_created_at_idx
+    ON research_papers (primary_category, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS research_papers_created_at_idx
+    ON research_papers (created_at DESC);
+
+CREATE INDEX IF NOT EXISTS research_papers_title_idx
+    ON research_papers (title);
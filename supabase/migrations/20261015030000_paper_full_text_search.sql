@@ -0,0 +1,25 @@
+-- Full-text search for the Streamlit app: a weighted tsvector kept up to date
+-- by Postgres, a GIN index over it, and an RPC that ranks matches.
+ALTER TABLE research_papers
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(technical_summary, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(abstract, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS research_papers_search_vector_idx
+    ON research_papers USING GIN (search_vector);
+
+-- Returns matching rows best match first. PostgREST filters, order and limit
+-- can be chained onto the call; lim caps the result when called directly.
+CREATE OR REPLACE FUNCTION search_papers(q text, lim integer DEFAULT NULL)
+RETURNS SETOF research_papers
+LANGUAGE sql STABLE
+AS $$
+    SELECT *
+    FROM research_papers
+    WHERE search_vector @@ websearch_to_tsquery('english', q)
+    ORDER BY ts_rank(search_vector, websearch_to_tsquery('english', q)) DESC
+    LIMIT lim;
+$$;
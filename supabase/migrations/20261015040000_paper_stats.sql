@@ -0,0 +1,50 @@
+-- Dashboard aggregates for the Streamlit app, computed in one scan over the
+-- papers matching the current filters instead of over downloaded rows.
+-- NULL filter arguments mean "no filter"; q uses the full-text search_vector.
+CREATE OR REPLACE FUNCTION paper_stats(
+    today date,
+    categories text[] DEFAULT NULL,
+    since timestamptz DEFAULT NULL,
+    q text DEFAULT NULL
+)
+RETURNS TABLE (
+    total bigint,
+    today_count bigint,
+    ai_processed bigint,
+    avg_summary_words double precision,
+    has_contributions bigint,
+    has_methodology bigint,
+    has_significance bigint,
+    per_category jsonb
+)
+LANGUAGE sql STABLE
+AS $$
+    WITH filtered AS (
+        SELECT *
+        FROM research_papers
+        WHERE (categories IS NULL OR primary_category = ANY (categories))
+          AND (since IS NULL OR created_at >= since)
+          AND (q IS NULL OR search_vector @@ websearch_to_tsquery('english', q))
+    )
+    SELECT
+        count(*),
+        count(*) FILTER (WHERE created_at::date = today),
+        count(*) FILTER (WHERE coalesce(technical_summary, '') <> ''),
+        coalesce(avg(
+            CASE WHEN btrim(coalesce(technical_summary, '')) = '' THEN 0
+                 ELSE array_length(regexp_split_to_array(btrim(technical_summary), '\s+'), 1)
+            END
+        ), 0)::double precision,
+        count(*) FILTER (WHERE coalesce(cardinality(key_contributions), 0) > 0),
+        count(*) FILTER (WHERE coalesce(methodology, '') <> ''),
+        count(*) FILTER (WHERE coalesce(significance, '') <> ''),
+        (
+            SELECT coalesce(jsonb_object_agg(category, n), '{}'::jsonb)
+            FROM (
+                SELECT coalesce(primary_category, 'Unknown') AS category, count(*) AS n
+                FROM filtered
+                GROUP BY 1
+            ) per_category
+        )
+    FROM filtered;
+$$;
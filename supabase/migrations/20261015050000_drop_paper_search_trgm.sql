@@ -0,0 +1,4 @@
+-- Keyword search now goes through the full-text search_papers RPC, so nothing
+-- runs ilike against these trigram indexes; drop them so upserts of the large
+-- technical_summary text no longer pay to maintain them.
+DROP INDEX IF EXISTS research_papers_title_trgm_idx, research_papers_technical_summary_trgm_idx;
@@ -0,0 +1,117 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from research_crew.tools.arxiv_tools import (
+    HuggingFaceSupplementTool,
+    OptimizedArXivTool,
+    SmartResearchFetcher,
+    _classify,
+)
+
+
+@pytest.mark.parametrize('categories, expected', [
+    (('cs.CV',), 'Computer Vision'),
+    (('math.OC', 'cs.CL'), 'Natural Language Processing'),
+])
+def test_classify_prefers_arxiv_categories(categories, expected):
+    assert _classify(categories, 'Policy learning for agents', '') == expected
+
+
+@pytest.mark.parametrize('title, expected', [
+    ('Segmenting images with deep networks', 'Computer Vision'),
+    ('A transformer language model trained with deep learning', 'Natural Language Processing'),
+    ('Training agents with policy gradients', 'Reinforcement Learning'),
+    ('Recurrent networks for time series', 'Deep Learning'),
+    ('World models for planning', 'Machine Learning'),
+    ('Sampling bounds for kernels', 'Machine Learning'),
+])
+def test_classify_keywords_by_priority_and_inflection(title, expected):
+    assert _classify((), title, '') == expected
+
+
+@pytest.fixture
+def fetcher():
+    return SmartResearchFetcher()
+
+
+def test_deduplicate_drops_titles_differing_in_punctuation_and_case(fetcher):
+    papers = [
+        {'title': 'Attention Is All You Need'},
+        {'title': 'attention is all you need!'},
+        {'title': 'Attention is not all you need'},
+    ]
+    titles = [paper['title'] for paper in fetcher._deduplicate_papers(papers)]
+    assert titles == ['Attention Is All You Need', 'Attention is not all you need']
+
+
+def test_deduplicate_treats_empty_titles_as_duplicates(fetcher):
+    papers = [{'title': ''}, {}, {'title': 'Graph networks'}]
+    assert len(list(fetcher._deduplicate_papers(papers))) == 2
+
+
+ATOM_ENTRY = """<entry xmlns="http://www.w3.org/2005/Atom">
+  <id>http://arxiv.org/abs/2401.00001v1</id>
+  <published>2024-01-01T00:00:00Z</published>
+  <title>A paper</title>
+  <summary>An abstract.</summary>
+  <author><name>Ada Lovelace</name></author>
+  <author><name>Alan Turing</name></author>
+  <category term="cs.LG"/>
+  <category term="stat.ML"/>
+</entry>"""
+
+
+def test_parse_entry_collects_atom_fields():
+    fields = OptimizedArXivTool._parse_entry(ET.fromstring(ATOM_ENTRY))
+    assert fields == {
+        'id': 'http://arxiv.org/abs/2401.00001v1',
+        'published': '2024-01-01T00:00:00Z',
+        'title': 'A paper',
+        'summary': 'An abstract.',
+        'authors': ['Ada Lovelace', 'Alan Turing'],
+        'categories': ['cs.LG', 'stat.ML'],
+    }
+
+
+RSS_FEED = b"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <channel>
+    <item>
+      <title>First</title>
+      <description>First abstract</description>
+      <link>https://huggingface.co/papers/1</link>
+      <pubDate>Mon, 01 Jan 2024 00:00:00 GMT</pubDate>
+      <dc:creator>Ada Lovelace</dc:creator>
+    </item>
+    <item>
+      <title>Second</title>
+    </item>
+  </channel>
+</rss>"""
+
+
+def test_parse_feed_reads_rss_items_up_to_limit():
+    assert HuggingFaceSupplementTool._parse_feed(RSS_FEED, limit=1) == [{
+        'title': 'First',
+        'summary': 'First abstract',
+        'link': 'https://huggingface.co/papers/1',
+        'published': 'Mon, 01 Jan 2024 00:00:00 GMT',
+        'authors': ['Ada Lovelace'],
+    }]
+
+
+def test_parse_feed_falls_back_to_feedparser_for_atom():
+    feed = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <title>Atom paper</title>
+    <link href="https://huggingface.co/papers/2"/>
+    <author><name>Alan Turing</name></author>
+  </entry>
+</feed>"""
+    papers = HuggingFaceSupplementTool._parse_feed(feed, limit=5)
+    assert len(papers) == 1
+    assert papers[0]['title'] == 'Atom paper'
+    assert papers[0]['link'] == 'https://huggingface.co/papers/2'
+    assert papers[0]['authors'] == ['Alan Turing']
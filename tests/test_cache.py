@@ -0,0 +1,35 @@
+import os
+
+from research_crew.utils.cache import DiskCache
+
+
+def make_cache(tmp_path, ttl=60):
+    cache = DiskCache('test', ttl=ttl)
+    cache.directory = tmp_path
+    return cache
+
+
+def test_round_trip(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.set('key', {'papers': [1, 2]})
+    assert cache.get('key') == {'papers': [1, 2]}
+    assert cache.get('missing') is None
+
+
+def test_expired_entry_is_deleted_on_get(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.set('key', 'value')
+    path = cache._path('key')
+    os.utime(path, (0, 0))
+    assert cache.get('key') is None
+    assert not path.exists()
+
+
+def test_first_set_prunes_expired_entries(tmp_path):
+    make_cache(tmp_path).set('old', 'value')
+    cache = make_cache(tmp_path)
+    stale = cache._path('old')
+    os.utime(stale, (0, 0))
+    cache.set('new', 'value')
+    assert not stale.exists()
+    assert cache.get('new') == 'value'